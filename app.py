@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
-import sqlite3, os, datetime, io, hashlib, shutil
-import plotly.express as px
+import numpy as np
+import sqlite3, os, datetime, io, hmac, threading, csv, html, functools
+from hashlib import sha256 as _sha256
 
 
 # ---------- File Paths ----------
@@ -14,30 +15,87 @@ USER_ACTIVITY_PATH = "data/user_activity.csv"
 
 
 # ---------- Database Connection ----------
+# Streamlit re-executes this script on every rerun, so module globals are reset each
+# time; state that must persist for the whole process lives in st.cache_resource.
+# Fetched lazily at each write: calling a cached function at import time would run a
+# Streamlit command before st.set_page_config() in main().
+@st.cache_resource
+def _write_lock():
+    """Process-wide lock serializing writes on the shared connection."""
+    return threading.Lock()
+
+
+@st.cache_resource
 def get_db_conn():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    """Return the process-wide SQLite connection (opened once and reused)."""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, cached_statements=512)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+
+@st.cache_resource
+def get_ro_conn():
+    """Return the process-wide read-only SQLite connection, used for SELECT-only paths.
+    With WAL, readers on this connection don't wait on writes made through get_db_conn().
+    """
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False, cached_statements=256)
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+
+# ---------- CSV Log Helpers ----------
+def _append_csv(path, header, row):
+    """Append a single row to a CSV log, writing the header when the file is new."""
+    try:
+        f = open(path, 'a', newline='', encoding='utf-8')
+    except FileNotFoundError:
+        # data/ is normally created by _init_once(); only create it if it has gone missing
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f = open(path, 'a', newline='', encoding='utf-8')
+    with f:
+        w = csv.writer(f)
+        # append mode starts at end-of-file, so position 0 means the file is empty
+        if f.tell() == 0:
+            w.writerow(header)
+        w.writerow(row)
 
 
 # ---------- DB & CSV Migration Helpers ----------
+@st.cache_resource
+def _schema_cols():
+    """Table name -> column names, filled once the schema has been ensured (it doesn't change afterwards)."""
+    return {}
+
+
 def ensure_users_table():
+    schema = _schema_cols()
+    if 'users' in schema:
+        # schema already verified/migrated in this process
+        return
     conn = get_db_conn()
     cur = conn.cursor()
     # Check if users table exists
     cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
     if not cur.fetchone():
         # create table fresh
-        cur.execute(
-            """
-            CREATE TABLE users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE,
-                password TEXT,
-                created_at TEXT
+        with _write_lock():
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT UNIQUE,
+                    password TEXT,
+                    created_at TEXT
+                )
+                """
             )
-            """
-        )
-        conn.commit()
-        conn.close()
+        schema['users'] = {"id", "username", "password", "created_at"}
         return
 
     # table exists; get columns
@@ -46,21 +104,9 @@ def ensure_users_table():
     needed = set(["id", "username", "password", "created_at"])
     if set(cols) == needed or ("username" in cols and "password" in cols and "created_at" in cols):
         # table already has the needed columns (or at least username/password/created_at)
-        conn.close()
+        schema['users'] = set(cols)
         return
 
-    # Perform migration: create a new table, copy relevant columns, drop old, rename
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users_new (
-            id INTEGER PRIMARY KEY,
-            username TEXT UNIQUE,
-            password TEXT,
-            created_at TEXT
-        )
-        """
-    )
-
     # Try to copy username and password; set created_at to existing column if present else current time
     # Build select list depending on existing cols
     select_cols = []
@@ -77,14 +123,26 @@ def ensure_users_table():
     else:
         insert_sql = f"INSERT OR IGNORE INTO users_new (username, password, created_at) SELECT {', '.join(select_cols)} FROM users"
 
-    cur.execute(insert_sql)
-    conn.commit()
+    # Perform migration: create a new table, copy relevant columns, drop old, rename.
+    # All steps run in one transaction so a failure leaves the old table intact.
+    with _write_lock(), conn:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS users_new (
+                id INTEGER PRIMARY KEY,
+                username TEXT UNIQUE,
+                password TEXT,
+                created_at TEXT
+            )
+            """
+        )
+        cur.execute(insert_sql)
 
-    # Drop old table and rename new
-    cur.execute("DROP TABLE users")
-    cur.execute("ALTER TABLE users_new RENAME TO users")
-    conn.commit()
-    conn.close()
+        # Drop old table and rename new
+        cur.execute("DROP TABLE users")
+        cur.execute("ALTER TABLE users_new RENAME TO users")
+    schema['users'] = needed
 
 
 def save_feedback(username: str, feedback: str):
@@ -106,32 +164,25 @@ def save_feedback(username: str, feedback: str):
                 user_id = r[0]
 
         # Ensure feedback table has user_id column (migration may have added it)
-        cur.execute("PRAGMA table_info(feedback)")
-        cols = [c[1] for c in cur.fetchall()]
-        if 'user_id' in cols:
-            cur.execute(
-                "INSERT INTO feedback (username, user_id, feedback, feedback_at) VALUES (?,?,?,?)",
-                (username or '', user_id, feedback, ts),
-            )
-        else:
-            cur.execute(
-                "INSERT INTO feedback (username, feedback, feedback_at) VALUES (?,?,?)",
-                (username or '', feedback, ts),
-            )
-        conn.commit()
-        conn.close()
+        cols = _schema_cols().get('feedback')
+        if cols is None:
+            cur.execute("PRAGMA table_info(feedback)")
+            cols = {c[1] for c in cur.fetchall()}
+        with _write_lock():
+            if 'user_id' in cols:
+                cur.execute(
+                    "INSERT INTO feedback (username, user_id, feedback, feedback_at) VALUES (?,?,?,?)",
+                    (username or '', user_id, feedback, ts),
+                )
+            else:
+                cur.execute(
+                    "INSERT INTO feedback (username, feedback, feedback_at) VALUES (?,?,?)",
+                    (username or '', feedback, ts),
+                )
+        _bump_feedback_version()
         # Also append to a CSV log for easy access
         try:
-            os.makedirs(os.path.dirname(FEEDBACK_LOG_PATH), exist_ok=True)
-            df_row = pd.DataFrame([{
-                'username': username or '',
-                'feedback': feedback,
-                'feedback_at': ts
-            }])
-            if not os.path.exists(FEEDBACK_LOG_PATH):
-                df_row.to_csv(FEEDBACK_LOG_PATH, index=False)
-            else:
-                df_row.to_csv(FEEDBACK_LOG_PATH, mode='a', header=False, index=False)
+            _append_csv(FEEDBACK_LOG_PATH, ('username', 'feedback', 'feedback_at'), (username or '', feedback, ts))
         except Exception:
             # don't fail the main operation if CSV logging fails
             pass
@@ -146,72 +197,78 @@ def ensure_feedback_table():
     """
     conn = get_db_conn()
     cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS feedback (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT,
-            feedback TEXT,
-            feedback_at TEXT
+    with _write_lock():
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS feedback (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT,
+                feedback TEXT,
+                feedback_at TEXT
+            )
+            """
         )
-        """
-    )
-    conn.commit()
 
     # Ensure user_id column exists for stronger linkage
     cur.execute("PRAGMA table_info(feedback)")
     existing = [c[1] for c in cur.fetchall()]
     if 'user_id' not in existing:
         try:
-            cur.execute("ALTER TABLE feedback ADD COLUMN user_id INTEGER")
-            conn.commit()
+            with _write_lock():
+                cur.execute("ALTER TABLE feedback ADD COLUMN user_id INTEGER")
             # refresh existing list
             cur.execute("PRAGMA table_info(feedback)")
             existing = [c[1] for c in cur.fetchall()]
         except Exception:
             # SQLite may fail if certain constraints exist; ignore and continue
             pass
+    _schema_cols()['feedback'] = set(existing)
 
     # Migrate any existing feedback stored in the CSV file (older behavior)
     try:
         if os.path.exists(USERS_CSV_PATH):
             df = pd.read_csv(USERS_CSV_PATH)
             if 'feedback' in df.columns:
-                migrated = 0
-                for _, row in df.iterrows():
-                    fb = row.get('feedback', '')
-                    if pd.notna(fb) and str(fb).strip() != '':
-                        uname = row.get('username', '') if 'username' in df.columns else ''
-                        fb_at = row.get('feedback_at', '') if 'feedback_at' in df.columns else ''
-                        if not fb_at or pd.isna(fb_at):
-                            fb_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        cur.execute(
-                            "SELECT id FROM feedback WHERE username=? AND feedback=? AND feedback_at=?",
-                            (uname, fb, fb_at),
-                        )
-                        if not cur.fetchone():
-                            # attempt to resolve user id
-                            uid = None
-                            if 'username' in df.columns and uname:
-                                cur.execute("SELECT id FROM users WHERE username=?", (uname,))
-                                r = cur.fetchone()
-                                if r:
-                                    uid = r[0]
-                            if 'user_id' in existing:
-                                cur.execute(
-                                    "INSERT INTO feedback (username, user_id, feedback, feedback_at) VALUES (?,?,?,?)",
-                                    (uname or '', uid, fb, fb_at),
-                                )
-                            else:
-                                cur.execute(
-                                    "INSERT INTO feedback (username, feedback, feedback_at) VALUES (?,?,?)",
-                                    (uname or '', fb, fb_at),
-                                )
-                            migrated += 1
-                if migrated > 0:
-                    conn.commit()
+                now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                key_cols = ['username', 'feedback', 'feedback_at']
+                df = df[df['feedback'].notna() & df['feedback'].astype(str).str.strip().ne('')]
+                mig = pd.DataFrame({
+                    'username': df['username'].fillna('').astype(str) if 'username' in df.columns else '',
+                    'feedback': df['feedback'].astype(str),
+                    'feedback_at': (
+                        df['feedback_at'].where(df['feedback_at'].notna() & df['feedback_at'].astype(str).ne(''), now).astype(str)
+                        if 'feedback_at' in df.columns else now
+                    ),
+                }, index=df.index).drop_duplicates()
+
+                # Drop rows already in the DB (anti-join against existing keys fetched once)
+                existing_df = pd.read_sql_query("SELECT username, feedback, feedback_at FROM feedback", conn)
+                existing_df = existing_df.fillna('').astype(str)
+                mig = mig.merge(existing_df.drop_duplicates(), on=key_cols, how='left', indicator=True)
+                mig = mig[mig['_merge'] == 'left_only'].drop(columns='_merge')
+
+                # Resolve user ids with a single join instead of a lookup per row
+                users_df = pd.read_sql_query("SELECT username, id AS user_id FROM users WHERE username != ''", conn)
+                mig = mig.merge(users_df.drop_duplicates('username'), on='username', how='left')
+                mig['user_id'] = mig['user_id'].astype('Int64').astype(object).where(mig['user_id'].notna(), None)
+
+                if not mig.empty:
+                    # single transaction for the whole batch
+                    with _write_lock(), conn:
+                        cur.execute("BEGIN IMMEDIATE")
+                        if 'user_id' in existing:
+                            cur.executemany(
+                                "INSERT INTO feedback (username, user_id, feedback, feedback_at) VALUES (?,?,?,?)",
+                                mig[['username', 'user_id', 'feedback', 'feedback_at']].itertuples(index=False, name=None),
+                            )
+                        else:
+                            cur.executemany(
+                                "INSERT INTO feedback (username, feedback, feedback_at) VALUES (?,?,?)",
+                                mig[key_cols].itertuples(index=False, name=None),
+                            )
             # Archive the CSV so migration doesn't run repeatedly
             try:
+                import shutil
                 bak = USERS_CSV_PATH + ".migrated"
                 shutil.move(USERS_CSV_PATH, bak)
             except Exception:
@@ -220,31 +277,103 @@ def ensure_feedback_table():
         # migration is best-effort; don't block app startup on failure
         pass
 
-    conn.close()
+def ensure_indexes():
+    """Create lookup indexes on users(username) and feedback(user_id).
+    Tables created here declare `username UNIQUE` (SQLite backs that with an automatic
+    index), but a pre-existing users table that already had the needed columns is kept
+    as-is and may lack it; only then is a username index added.
+    """
+    cur = get_db_conn().cursor()
+    with _write_lock():
+        # is there already a unique index on users(username) besides our own?
+        has_unique = False
+        for idx in cur.execute("PRAGMA index_list(users)").fetchall():
+            name, unique = idx[1], idx[2]
+            if unique and name != 'idx_users_username':
+                idx_cols = [c[2] for c in cur.execute(f'PRAGMA index_info("{name}")').fetchall()]
+                if idx_cols == ['username']:
+                    has_unique = True
+                    break
+        if has_unique:
+            # drop the duplicate B-tree an earlier version of this helper may have created
+            cur.execute("DROP INDEX IF EXISTS idx_users_username")
+        else:
+            try:
+                cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON users(username)")
+            except sqlite3.IntegrityError:
+                # legacy data with duplicate usernames: fall back to a non-unique index
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_users_username_nu ON users(username)")
+        if 'user_id' in _schema_cols().get('feedback', ()):
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_feedback_user ON feedback(user_id)")
+        # The admin page reads `ORDER BY id DESC LIMIT 200`. When id is the rowid alias
+        # (INTEGER PRIMARY KEY) that is a backward B-tree walk; older tables may lack it.
+        cur.execute("PRAGMA table_info(feedback)")
+        id_is_rowid = any(
+            c[1] == 'id' and c[5] == 1 and (c[2] or '').upper() == 'INTEGER' for c in cur.fetchall()
+        )
+        if not id_is_rowid:
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_feedback_id_desc ON feedback(id DESC)")
 
  # ---------- Authentication Helpers ----------
+def _lookup_user(username):
+    cur = get_ro_conn().cursor()
+    cur.execute("SELECT id, username FROM users WHERE username=?", (username,))
+    row = cur.fetchone()
+    if row:
+        return {"id": row[0], "username": row[1]}
+    return None
+
 def current_user():
-    if os.path.exists(CURRENT_USER_FILE):
+    """Return the logged-in user as {"id", "username"}, or None.
+    The resolved user is cached in st.session_state['_user'] so reruns don't hit the
+    DB; set_current_user/clear_current_user keep it in sync on login and logout.
+    """
+    # fast path: user already resolved for this session
+    user = st.session_state.get('_user')
+    if user:
+        return user
+    # cold start (e.g. after a server restart): fall back to the current-user file
+    try:
         with open(CURRENT_USER_FILE, "r") as f:
             username = f.read().strip()
-            if username:
-                # verify exists in DB
-                conn = get_db_conn()
-                cur = conn.cursor()
-                cur.execute("SELECT id, username FROM users WHERE username=?", (username,))
-                row = cur.fetchone()
-                conn.close()
-                if row:
-                    return {"id": row[0], "username": row[1]}
+    except FileNotFoundError:
+        return None
+    if username:
+        # verify exists in DB, then hydrate the session so later reruns skip the file
+        user = _lookup_user(username)
+        if user:
+            st.session_state['_user'] = user
+            return user
     return None
 
 def set_current_user(username):
+    # session_state is the primary store; the file only survives process restarts
     with open(CURRENT_USER_FILE, "w") as f:
         f.write(username)
+    user = _lookup_user(username)
+    if user:
+        st.session_state['_user'] = user
+    else:
+        st.session_state.pop('_user', None)
 
 def clear_current_user():
-    if os.path.exists(CURRENT_USER_FILE):
+    st.session_state.pop('_user', None)
+    try:
         os.remove(CURRENT_USER_FILE)
+    except FileNotFoundError:
+        pass
+
+def require_role(role):
+    """Page decorator: render the wrapped page only for the user named `role`."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(user, *args, **kwargs):
+            if user.get('username') != role:
+                st.error(f'{role.capitalize()} access required')
+                return
+            return fn(user, *args, **kwargs)
+        return wrapper
+    return deco
 
 def signup(username, password):
     conn = get_db_conn()
@@ -253,31 +382,19 @@ def signup(username, password):
         # prevent duplicate username
         cur.execute("SELECT id FROM users WHERE username=?", (username,))
         if cur.fetchone():
-            conn.close()
             return False, "Username already exists"
 
         created_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         hashed = hash_password(password)
-        cur.execute("INSERT INTO users (username, password, created_at) VALUES (?,?,?)", (username, hashed, created_at))
-        conn.commit()
-        conn.close()
+        with _write_lock():
+            cur.execute("INSERT INTO users (username, password, created_at) VALUES (?,?,?)", (username, hashed, created_at))
         # Append to users export CSV (store hashed password for safety)
         try:
-            os.makedirs(os.path.dirname(USERS_EXPORT_PATH), exist_ok=True)
-            df_row = pd.DataFrame([{
-                'username': username,
-                'created_at': created_at,
-                'password': hashed
-            }])
-            if not os.path.exists(USERS_EXPORT_PATH):
-                df_row.to_csv(USERS_EXPORT_PATH, index=False)
-            else:
-                df_row.to_csv(USERS_EXPORT_PATH, mode='a', header=False, index=False)
+            _append_csv(USERS_EXPORT_PATH, ('username', 'created_at', 'password'), (username, created_at, hashed))
         except Exception:
             pass
         return True, "Account created"
     except Exception as e:
-        conn.close()
         return False, str(e)
 
 def check_credentials(username, password):
@@ -286,58 +403,57 @@ def check_credentials(username, password):
     cur.execute("SELECT id, password FROM users WHERE username=?", (username,))
     row = cur.fetchone()
     if not row:
-        conn.close()
         return False
 
     user_id, stored = row[0], row[1]
 
     def log_login(u):
         try:
-            os.makedirs(os.path.dirname(USER_ACTIVITY_PATH), exist_ok=True)
             ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            df_row = pd.DataFrame([{
-                'username': u,
-                'event': 'login',
-                'at': ts
-            }])
-            if not os.path.exists(USER_ACTIVITY_PATH):
-                df_row.to_csv(USER_ACTIVITY_PATH, index=False)
-            else:
-                df_row.to_csv(USER_ACTIVITY_PATH, mode='a', header=False, index=False)
+            _append_csv(USER_ACTIVITY_PATH, ('username', 'event', 'at'), (u, 'login', ts))
         except Exception:
             pass
 
     # If stored password looks like a sha256 hex (64 chars) we verify normally
-    if stored and isinstance(stored, str) and len(stored) == 64 and all(c in '0123456789abcdef' for c in stored.lower()):
+    is_hashed = False
+    if stored and isinstance(stored, str) and len(stored) == 64:
+        try:
+            bytes.fromhex(stored)
+            is_hashed = True
+        except ValueError:
+            pass
+    if is_hashed:
         ok = verify_password(password, stored)
         if ok:
             log_login(username)
-        conn.close()
         return ok
 
     # Otherwise assume legacy plaintext password: check directly and migrate on success
     if stored == password:
         try:
             hashed = hash_password(password)
-            cur.execute("UPDATE users SET password=? WHERE id=?", (hashed, user_id))
-            conn.commit()
+            with _write_lock():
+                cur.execute("UPDATE users SET password=? WHERE id=?", (hashed, user_id))
         except Exception:
             pass
         log_login(username)
-        conn.close()
         return True
 
-    conn.close()
     return False
 
 
 def hash_password(password: str) -> str:
     # use sha256 for now (better to use bcrypt in production)
-    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+    return _sha256(password.encode('utf-8')).hexdigest()
 
 
 def verify_password(password: str, hashed: str) -> bool:
-    return hashlib.sha256(password.encode('utf-8')).hexdigest() == hashed
+    try:
+        expected = bytes.fromhex(hashed)
+    except ValueError:
+        return False
+    # constant-time comparison of the raw digests
+    return hmac.compare_digest(_sha256(password.encode('utf-8')).digest(), expected)
 
 # ---------- UI Pages ----------
  # ---------- Login Page ----------
@@ -380,6 +496,41 @@ def show_signup():
         st.rerun()
 
  # ---------- Home Page ----------
+def _shrink(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcast numeric columns and turn low-cardinality text columns into categories.
+    Only lossless conversions: the user's values must come back unchanged.
+    """
+    for c in df.select_dtypes(include='integer').columns:
+        df[c] = pd.to_numeric(df[c], downcast='integer')
+    for c in df.select_dtypes(include='floating').columns:
+        # float32 only when every value round-trips exactly (NaN compares unequal, so mask it)
+        s32 = df[c].astype('float32')
+        same = (s32.astype(df[c].dtype) == df[c]) | df[c].isna()
+        if same.all():
+            df[c] = s32
+    n = max(len(df), 1)
+    # 'string' too: under pandas 3 text columns default to the str dtype, not object
+    for c in df.select_dtypes(include=['object', 'string']).columns:
+        if df[c].nunique(dropna=False) / n < 0.5:
+            df[c] = df[c].astype('category')
+    return df
+
+# bounded so uploads from all sessions don't stay pickled in memory for the server's lifetime
+@st.cache_data(show_spinner=False, max_entries=16, ttl=3600)
+def _parse_upload(name: str, data: bytes) -> pd.DataFrame:
+    """Parse an uploaded CSV/Excel file; cached on the file name and contents."""
+    ext = os.path.splitext(name)[1].lower()
+    if ext == '.csv':
+        try:
+            # multithreaded C++ parser; much faster on large files
+            df = pd.read_csv(io.BytesIO(data), engine='pyarrow')
+        except Exception:
+            # pyarrow missing or an input it can't handle: use the default parser
+            df = pd.read_csv(io.BytesIO(data))
+    else:
+        df = pd.read_excel(io.BytesIO(data))
+    return _shrink(df)
+
 def page_home(user):
     st.title("Data Analyzer app")
     st.write(f"Welcome, **{user['username']}**")
@@ -394,25 +545,26 @@ def page_home(user):
 
     if 'uploaded_dfs' not in st.session_state:
         st.session_state['uploaded_dfs'] = {}
+    # name -> uploader file_id of the frame currently stored in uploaded_dfs
+    upload_ids = st.session_state.setdefault('uploaded_file_ids', {})
 
     if uploaded_files:
         for up in uploaded_files:
             name = up.name
             try:
-                ext = os.path.splitext(name)[1].lower()
-                if ext == '.csv':
-                    df = pd.read_csv(up)
-                else:
-                    up.seek(0)
-                    df = pd.read_excel(up)
-                st.session_state['uploaded_dfs'][name] = df
+                # only (re)parse and reassign when the upload actually changed, so the stored
+                # frame keeps its identity across reruns
+                if upload_ids.get(name) != up.file_id or name not in st.session_state['uploaded_dfs']:
+                    st.session_state['uploaded_dfs'][name] = _parse_upload(name, up.getvalue())
+                    upload_ids[name] = up.file_id
+                df = st.session_state['uploaded_dfs'][name]
                 st.success(f"Loaded {name} — {df.shape[0]} rows, {df.shape[1]} columns")
             except Exception as e:
                 st.error(f"Failed to load {name}: {e}")
 
     if st.session_state.get('uploaded_dfs'):
         st.subheader("Uploaded files")
-        files = list(st.session_state['uploaded_dfs'].keys())
+        files = tuple(st.session_state['uploaded_dfs'])
         sel = st.selectbox("Select file to view", files)
         df_sel = st.session_state['uploaded_dfs'][sel]
         st.markdown(f"**{sel}** — {df_sel.shape[0]} rows, {df_sel.shape[1]} columns")
@@ -427,12 +579,14 @@ def page_analysis(user):
         st.info("No dataset uploaded yet. Go to Home and upload CSV/Excel files to analyze.")
         return
 
-    files = list(st.session_state['uploaded_dfs'].keys())
+    files = tuple(st.session_state['uploaded_dfs'])
     # Use a persistent key for selected dataset so selection survives navigation
     if 'analysis_dataset' not in st.session_state:
         st.session_state['analysis_dataset'] = files[0]
     first_name = st.selectbox("Select dataset to analyze", files, key='analysis_dataset')
     df = st.session_state['uploaded_dfs'][first_name]
+    # column Index is sequence-like; reuse it for every column widget below
+    cols = df.columns
     # Show full dataset preview before analysis as requested
     st.subheader(f"Full dataset preview — {first_name} (showing all rows)")
     st.dataframe(df)
@@ -450,17 +604,25 @@ def page_analysis(user):
     search_col_key = f"analysis_searchcol::{first_name}"
     if search_col_key not in st.session_state:
         # default to first column
-        st.session_state[search_col_key] = list(df.columns)[0] if len(df.columns) > 0 else ''
-    search_col = st.selectbox("Select column to search", df.columns, key=search_col_key)
+        st.session_state[search_col_key] = cols[0] if len(cols) > 0 else ''
+    search_col = st.selectbox("Select column to search", cols, key=search_col_key)
 
     search_val_key = f"analysis_searchval::{first_name}"
     if search_val_key not in st.session_state:
         st.session_state[search_val_key] = ''
     search_val = st.text_input("Enter value to search", key=search_val_key)
 
-    filtered_df = df.copy()
+    # no copy needed: the frame is only sliced below, never mutated
     if search_val:
-        filtered_df = filtered_df[filtered_df[search_col].astype(str).str.contains(search_val, case=False, na=False)]
+        # Lowercased string view of the search column, reused while the user types.
+        # A single entry is kept: switching dataset or column replaces (evicts) it.
+        cached = st.session_state.get('analysis_lower')
+        if cached is None or cached[0] is not df or cached[1] != search_col:
+            cached = (df, search_col, df[search_col].astype(str).str.lower())
+            st.session_state['analysis_lower'] = cached
+        filtered_df = df[cached[2].str.contains(search_val.lower(), regex=False).to_numpy()]
+    else:
+        filtered_df = df
 
 
     # Data range (row range) selection based on 'rows' value
@@ -484,10 +646,10 @@ def page_analysis(user):
         st.subheader("Select Columns to Display")
         cols_key = f"analysis_cols::{first_name}"
         if cols_key not in st.session_state:
-            st.session_state[cols_key] = list(filtered_range_df.columns)
+            st.session_state[cols_key] = list(cols)
         display_columns = st.multiselect(
             "Choose columns to display",
-            options=list(filtered_range_df.columns),
+            options=cols,
             default=st.session_state[cols_key],
             key=cols_key
         )
@@ -513,8 +675,14 @@ def page_analysis(user):
         st.info("No data to display for the selected filters.")
         filtered_range_df = filtered_df.iloc[0:0]
         st.dataframe(filtered_range_df)
-    # Download button for filtered dashboard data
-    csv = filtered_range_df.to_csv(index=False).encode('utf-8')
+    # Download button for filtered dashboard data. The encoded CSV is memoized per
+    # session and only rebuilt when the dataset, filter or row range changes.
+    csv_fp = (search_col, search_val, int(rows), data_from if data_max > 0 else None)
+    cached_csv = st.session_state.get('analysis_csv')
+    if cached_csv is None or cached_csv[0] is not df or cached_csv[1] != csv_fp:
+        cached_csv = (df, csv_fp, filtered_range_df.to_csv(index=False).encode('utf-8'))
+        st.session_state['analysis_csv'] = cached_csv
+    csv = cached_csv[2]
     st.download_button(
         label="Download Dashboard Data as CSV",
         data=csv,
@@ -523,16 +691,25 @@ def page_analysis(user):
     )
 
  # ---------- Charts/Visualization Page ----------
+# bounded: the key embeds the figure's data, and the rendered bytes are kept for every session
+@st.cache_data(show_spinner=False, max_entries=16, ttl=3600)
+def _render_chart_image(fig_json: str, fmt: str) -> bytes:
+    """Export a figure (given as plotly JSON) to an image; cached per figure and format."""
+    import plotly.io as pio
+    return pio.from_json(fig_json).to_image(format=fmt)
+
 def page_charts(user):
+    # imported lazily: plotly is heavy and only needed once this page is opened
+    import plotly.express as px
     if not st.session_state.get('uploaded_dfs'):
         st.info("No dataset uploaded yet. Go to Home and upload CSV/Excel files to create charts.")
         return
-    files = list(st.session_state['uploaded_dfs'].keys())
+    files = tuple(st.session_state['uploaded_dfs'])
     # If there's an analysis result in session, add it as a selectable option at top
     use_analysis_label = None
     if st.session_state.get('analysis_result_df') is not None:
         use_analysis_label = f"Last analysis: {st.session_state.get('analysis_result_name','result')}"
-        files = [use_analysis_label] + files
+        files = (use_analysis_label,) + files
 
     selected = st.selectbox("Select dataset for charts", files)
     if use_analysis_label and selected == use_analysis_label:
@@ -549,9 +726,11 @@ def page_charts(user):
     chart_types = ["Bar","Line","Pie","Scatter","Histogram","Box","Area","Violin","Density Heatmap","Funnel","Sunburst","Treemap","Heatmap"]
     chart_type = st.selectbox("Select chart type", chart_types)
 
-    x_col = st.selectbox("X column", df.columns, key="chart_x")
-    y_col = st.selectbox("Y column (optional)", [None] + list(df.columns), key="chart_y")
-    color_col = st.selectbox("Color / group (optional)", [None] + list(df.columns), key="chart_color")
+    cols = df.columns
+    optional_cols = [None, *cols]
+    x_col = st.selectbox("X column", cols, key="chart_x")
+    y_col = st.selectbox("Y column (optional)", optional_cols, key="chart_y")
+    color_col = st.selectbox("Color / group (optional)", optional_cols, key="chart_color")
 
     plot_kwargs = {}
     if chart_type == "Pie":
@@ -625,7 +804,7 @@ def page_charts(user):
                 mime = 'text/html'
                 ext = 'html'
             else:
-                data = fig.to_image(format=fmt)
+                data = _render_chart_image(fig.to_json(), fmt)
                 mime = f'image/{"jpeg" if fmt=="jpeg" else fmt}' if fmt!='pdf' else 'application/pdf'
                 ext = fmt
             st.download_button(label=download_label, data=data, file_name=f"{fname}.{ext}", mime=mime)
@@ -636,6 +815,14 @@ def page_charts(user):
 
 # ---------- About Page ----------
  # ---------- About Page ----------
+# Footer with developer name and social links (replace placeholders with real URLs);
+# static, so built once at import instead of on every render
+DEV_NAME = "Aditya Kumar"
+GITHUB_URL = "https://github.com/Aditya-kumar-Devloper?tab=overview&from=2025-07-01&to=2025-07-31"
+LINKEDIN_URL = "https://www.linkedin.com/in/aditya-kumar-a779a32a2?utm_source=share&utm_campaign=share_via&utm_content=profile&utm_medium=android_app"
+DEV_NAME_MD = f"**Developer:** {DEV_NAME}"
+SOCIAL_LINKS_MD = f"[🐙 GitHub]({GITHUB_URL})  &nbsp;&nbsp; [🔗 LinkedIn]({LINKEDIN_URL})"
+
 def page_about(user):
     st.title("About Data Analyzer app")
 
@@ -710,69 +897,150 @@ def page_about(user):
             st.success(msg if msg != 'Saved' else 'Thank you — your feedback was saved.')
         else:
             st.error(f"Feedback not saved: {msg}")
-    # Footer with developer name and social links (replace placeholders with real URLs)
-    dev_name = "Aditya Kumar"
-    github_url = "https://github.com/Aditya-kumar-Devloper?tab=overview&from=2025-07-01&to=2025-07-31"
-    linkedin_url = "https://www.linkedin.com/in/aditya-kumar-a779a32a2?utm_source=share&utm_campaign=share_via&utm_content=profile&utm_medium=android_app"
-
-    st.markdown(f"**Developer:** {dev_name}")
-    st.markdown(
-        f"[🐙 GitHub]({github_url})  &nbsp;&nbsp; [🔗 LinkedIn]({linkedin_url})",
-        unsafe_allow_html=True,
+    # Footer with developer name and social links
+    st.markdown(DEV_NAME_MD)
+    st.markdown(SOCIAL_LINKS_MD, unsafe_allow_html=True)
+
+
+@st.cache_resource
+def _feedback_version():
+    """Process-wide feedback version token (shared by all sessions), bumped on every
+    feedback write so the caches keyed on it below are invalidated.
+    """
+    return {'v': 0}
+
+
+def _bump_feedback_version():
+    with _write_lock():
+        _feedback_version()['v'] += 1
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _load_feedback(version: int) -> pd.DataFrame:
+    """Latest feedback rows; `version` is the process-wide _feedback_version() token."""
+    # read_sql_query builds typed (Arrow-backed) columns straight from the cursor
+    return pd.read_sql_query(
+        "SELECT id, username, user_id, feedback, feedback_at FROM feedback ORDER BY id DESC LIMIT 200",
+        get_ro_conn(),
+        # feedback_at stays text: rows migrated from the legacy CSV may hold free-form dates
+        dtype_backend='pyarrow',
     )
 
 
-def page_admin(user):
-    # Only allow admin user (username 'admin') to access this page for now
-    if user['username'] != 'admin':
-        st.error('Admin access required')
-        return
+@st.cache_data(ttl=30, max_entries=4, show_spinner=False)
+def _csv_bytes(df: pd.DataFrame) -> bytes:
+    """Encode the feedback frame as CSV bytes; cached on the frame's contents."""
+    # pyarrow's C++ CSV writer (pyarrow ships with streamlit) avoids pandas' Python-level formatting
+    import pyarrow as pa
+    import pyarrow.csv as pac
+    tbl = pa.Table.from_pandas(df, preserve_index=False)
+    buf = pa.BufferOutputStream()
+    pac.write_csv(tbl, buf)
+    return buf.getvalue().to_pybytes()
 
+
+# Only allow admin user (username 'admin') to access this page for now
+@require_role('admin')
+def page_admin(user):
     st.title('Admin — Feedback')
-    conn = get_db_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT id, username, user_id, feedback, feedback_at FROM feedback ORDER BY id DESC LIMIT 200")
-    rows = cur.fetchall()
-    conn.close()
+    _feedback_fragment()
+
+
+@st.fragment
+def _feedback_fragment():
+    """Feedback table, export and delete controls. Runs as a fragment so widget
+    interactions here rerun only this block, not the whole script.
+    """
+    df = _load_feedback(_feedback_version()['v'])
+    delete_msg = st.session_state.pop('fb_delete_msg', None)
+    if delete_msg:
+        st.success(delete_msg)
 
-    if not rows:
+    if df.empty:
         st.info('No feedback entries found')
         return
 
-    df = pd.DataFrame(rows, columns=['id','username','user_id','feedback','feedback_at'])
-    st.dataframe(df)
+    # Render one page of entries with a truncated feedback preview; the full
+    # frame is only used for the CSV export below.
+    page_size = 25
+    page_idx = st.number_input('Page', min_value=0, max_value=(len(df) - 1) // page_size, value=0, step=1)
+    view = df.iloc[page_idx * page_size:(page_idx + 1) * page_size]
+    view = view.assign(feedback=view['feedback'].str.slice(0, 120))
+    st.dataframe(view, use_container_width=True)
 
-    # Export feedback to CSV
+    # Export feedback to CSV (bytes are cached on the frame, so reruns are a cache hit)
     try:
-        csv_data = df.to_csv(index=False).encode('utf-8')
+        csv_data = _csv_bytes(df)
+    except Exception as e:
+        st.exception(e)
+    else:
         st.download_button('Download feedback as CSV', data=csv_data, file_name='feedback_export.csv', mime='text/csv')
-    except Exception:
-        pass
 
-    to_delete = st.multiselect('Select feedback ids to delete', options=list(df['id']))
-    if st.button('Delete selected') and to_delete:
+    # one vectorized conversion to plain Python ints instead of per-element unboxing
+    id_opts = df['id'].to_numpy(dtype=np.int64).tolist()
+    # a form batches the selection so picking ids doesn't rerun the page on every click
+    with st.form('delete_fb', clear_on_submit=True):
+        to_delete = st.multiselect('Select feedback ids to delete', options=id_opts, key='fb_del_ids')
+        submitted = st.form_submit_button('Delete selected')
+    if submitted and to_delete:
+        ids = np.unique(np.asarray(to_delete, dtype=np.int64))
         conn = get_db_conn()
-        cur = conn.cursor()
-        cur.executemany('DELETE FROM feedback WHERE id=?', [(i,) for i in to_delete])
-        conn.commit()
-        conn.close()
-        st.success('Deleted selected entries — refresh the page')
+        deleted = []
+        with _write_lock(), conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # one DELETE ... IN (...) per chunk; SQLite allows at most 999 bound variables by default.
+            # Chunks are padded (repeating the last id) to a few fixed sizes so the SQL text
+            # repeats and sqlite3's statement cache can reuse the prepared statement.
+            for i in range(0, len(ids), 900):
+                chunk = ids[i:i + 900]
+                size = next(b for b in (8, 32, 128, 900) if b >= len(chunk))
+                chunk = np.pad(chunk, (0, size - len(chunk)), mode='edge')
+                placeholders = ','.join('?' * size)
+                # RETURNING (SQLite >= 3.35) reports the removed ids without a follow-up query
+                cur = conn.execute(f'DELETE FROM feedback WHERE id IN ({placeholders}) RETURNING id', chunk.tolist())
+                deleted.extend(r[0] for r in cur.fetchall())
+        if deleted:
+            _bump_feedback_version()
+        # rerun just this fragment so the table reloads; the message is shown on that run
+        st.session_state['fb_delete_msg'] = f'Deleted {len(deleted)} entries'
+        st.rerun(scope="fragment")
 
 # ---------- Main ----------
- # ---------- Main App Logic ----------
-def main():
-    st.set_page_config(page_title="Data Analyzer app", layout="wide")
-    # initialize session mode
-    if 'mode' not in st.session_state:
-        st.session_state['mode'] = 'login'
-    # ensure data directory exists
+# Sidebar navigation: page label -> render function
+PAGES = {
+    "Home": page_home,
+    "Data Analysis": page_analysis,
+    "Charts Analysis": page_charts,
+    "Admin": page_admin,
+    "About": page_about,
+}
+NAV_BASE = ("Home", "Data Analysis", "Charts Analysis", "About")
+NAV_ADMIN = ("Home", "Data Analysis", "Charts Analysis", "Admin", "About")
+
+@st.cache_resource
+def _init_once():
+    """Create the data directory and run the schema/migration helpers once per process
+    rather than on every rerun (a plain module-level flag would be reset by each rerun).
+    """
     try:
         os.makedirs(os.path.dirname(DB_PATH) or 'data', exist_ok=True)
     except Exception:
         pass
-    # Ensure DB schema is up-to-date
     ensure_users_table()
     ensure_feedback_table()
+    ensure_indexes()
+    # refresh planner statistics for the tables/indexes touched above
+    get_db_conn().execute("PRAGMA optimize")
+    return True
+
+ # ---------- Main App Logic ----------
+def main():
+    st.set_page_config(page_title="Data Analyzer app", layout="wide")
+    # initialize session mode
+    if 'mode' not in st.session_state:
+        st.session_state['mode'] = 'login'
+    # ensure data directory exists and DB schema is up-to-date
+    _init_once()
     user = current_user()
     if not user:
         # show only auth pages
@@ -782,27 +1050,19 @@ def main():
             show_login()
     else:
         # show original project with sidebar navigation
-        st.sidebar.markdown(f"**Logged in:** {user['username']}")
+        if 'sidebar_html' not in st.session_state:
+            st.session_state['sidebar_html'] = f"<b>Logged in:</b> {html.escape(user['username'])}"
+        st.sidebar.markdown(st.session_state['sidebar_html'], unsafe_allow_html=True)
         if st.sidebar.button("Logout"):
+            st.session_state.pop('sidebar_html', None)
             clear_current_user()
             st.session_state['mode'] = 'login'
             st.rerun()
 
         st.sidebar.title("Navigation")
-        nav_items = ["Home","Data Analysis","Charts Analysis","About"]
-        if user['username'] == 'admin':
-            nav_items.insert(3, 'Admin')
+        nav_items = NAV_ADMIN if user['username'] == 'admin' else NAV_BASE
         page = st.sidebar.radio("Go to", nav_items)
-        if page == "Home":
-            page_home(user)
-        elif page == "Data Analysis":
-            page_analysis(user)
-        elif page == "Charts Analysis":
-            page_charts(user)
-        elif page == "Admin":
-            page_admin(user)
-        elif page == "About":
-            page_about(user)
+        PAGES[page](user)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file